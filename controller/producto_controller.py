@@ -11,18 +11,44 @@ class ProductoController:
     Controlador que gestiona la lógica de negocio para productos.
     """
     
-    def __init__(self):
-        """Inicializa el controlador con el modelo."""
-        self.model = ProductoModel()
+    def __init__(self, cache=None, coalescer=None, model=None):
+        """
+        Inicializa el controlador con el modelo.
+        
+        Args:
+            cache (dict): Caché opcional de productos completos indexada por ID
+            coalescer (ProductoCoalescer): Capa single-flight opcional para
+                compartir búsquedas por ID concurrentes
+            model: Modelo a usar (por ejemplo, ProductoModelShardeado); por
+                defecto un ProductoModel sobre la conexión Singleton
+        """
+        self.model = model or ProductoModel()
+        self.cache = cache
+        self.coalescer = coalescer
     
-    def listar_productos(self):
+    def listar_productos(self, campos=None):
         """
         Obtiene la lista de todos los productos.
         
+        Args:
+            campos (list): Columnas a devolver; None devuelve todas
+        
         Returns:
             list: Lista de productos
         """
-        return self.model.listar_todos()
+        return self.model.listar_todos(campos=campos)
+    
+    def contar_productos(self, filtros=None):
+        """
+        Obtiene la cantidad de productos que cumplen los filtros.
+        
+        Args:
+            filtros (dict): Filtros a aplicar (mismo formato que el modelo)
+            
+        Returns:
+            int: Cantidad de productos
+        """
+        return self.model.contar_productos(filtros)
     
     def obtener_producto(self, producto_id):
         """
@@ -36,9 +62,66 @@ class ProductoController:
         """
         try:
             producto_id = int(producto_id)
-            return self.model.buscar_por_id(producto_id)
         except (ValueError, TypeError):
             return None
+        
+        if self.cache is not None and producto_id in self.cache:
+            return self.cache[producto_id]
+        
+        lector = self.coalescer or self.model
+        producto = lector.buscar_por_id(producto_id)
+        if producto and self.cache is not None:
+            self.cache[producto_id] = producto
+        return producto
+    
+    def obtener_productos(self, producto_ids):
+        """
+        Obtiene varios productos por sus IDs en el menor número de consultas.
+        
+        Los IDs no numéricos se ignoran y los repetidos se consultan una sola vez.
+        Si hay caché, se sirven desde ella los productos presentes y se guardan
+        en ella los obtenidos de la base de datos.
+        
+        Args:
+            producto_ids (iterable): IDs de los productos
+            
+        Returns:
+            dict: Diccionario {id: producto}; los IDs inexistentes no aparecen
+        """
+        ids = []
+        for producto_id in producto_ids:
+            try:
+                ids.append(int(producto_id))
+            except (ValueError, TypeError):
+                continue
+        ids = list(dict.fromkeys(ids))
+        
+        productos = {}
+        pendientes = ids
+        if self.cache is not None:
+            pendientes = []
+            for producto_id in ids:
+                if producto_id in self.cache:
+                    productos[producto_id] = self.cache[producto_id]
+                else:
+                    pendientes.append(producto_id)
+        
+        if pendientes:
+            encontrados = self.model.buscar_por_ids(pendientes)
+            if self.cache is not None:
+                self.cache.update(encontrados)
+            productos.update(encontrados)
+        return productos
+    
+    def _invalidar_cache(self, producto_id):
+        """
+        Elimina un producto de la caché, si existe.
+        
+        Args:
+            producto_id (int): ID del producto
+        """
+        if self.cache is not None:
+            self.cache.pop(producto_id, None)
     
     def agregar_producto(self, nombre, precio, categoria, stock):
         """
@@ -81,8 +164,7 @@ class ProductoController:
             return False, "El stock debe ser un número entero válido", None
         
         # Verificar duplicado por nombre
-        producto_existente = self.model.buscar_por_nombre(nombre)
-        if producto_existente:
+        if self.model.existe_nombre(nombre):
             return False, f"Ya existe un producto con el nombre '{nombre}'", None
         
         # Crear producto
@@ -118,7 +200,7 @@ class ProductoController:
             return False, "El ID debe ser un número válido"
         
         # Verificar que el producto existe
-        producto = self.model.buscar_por_id(producto_id)
+        producto = self.model.buscar_por_id(producto_id, campos=['id', 'nombre'])
         if not producto:
             return False, f"No existe un producto con ID {producto_id}"
         
@@ -149,19 +231,136 @@ class ProductoController:
         # Verificar duplicados (excepto el mismo producto)
         # Solo verificar si el nombre cambió respecto al original
         if nombre != producto['nombre']:
-            producto_existente = self.model.buscar_por_nombre(nombre)
-            if producto_existente and producto_existente['id'] != producto_id:
+            if self.model.existe_nombre(nombre, excluir_id=producto_id):
                 return False, f"Ya existe otro producto con el nombre '{nombre}'"
         
         # Actualizar producto
         try:
             if self.model.actualizar(producto_id, nombre, precio, categoria, stock):
+                self._invalidar_cache(producto_id)
                 return True, f"Producto '{nombre}' actualizado exitosamente"
             else:
                 return False, "No se pudo actualizar el producto"
         except Exception as e:
             return False, f"Error al actualizar producto: {str(e)}"
     
+    def actualizar_precios_masivo(self, filtros, porcentaje=None, monto=None, dry_run=False):
+        """
+        Ajusta los precios de todos los productos que cumplen los filtros.
+        
+        Args:
+            filtros (dict): Filtros a aplicar (categoria, precio_min,
+                precio_max); se requiere al menos uno
+            porcentaje (float): Variación porcentual del precio (8 = +8%)
+            monto (float): Variación absoluta del precio
+            dry_run (bool): Si es True solo se informa qué cambiaría
+            
+        Returns:
+            tuple: (éxito: bool, mensaje: str, resultado: dict o None)
+        """
+        error = self._validar_filtros_masivos(filtros)
+        if error:
+            return False, error, None
+        
+        try:
+            porcentaje = float(porcentaje) if porcentaje not in (None, '') else None
+            monto = float(monto) if monto not in (None, '') else None
+        except (ValueError, TypeError):
+            return False, "El ajuste de precio debe ser un número válido", None
+        
+        if (porcentaje is None) == (monto is None):
+            return False, "Debe indicar un porcentaje o un monto, pero no ambos", None
+        
+        try:
+            resultado = self.model.actualizar_precios(filtros, porcentaje=porcentaje, monto=monto, dry_run=dry_run)
+        except ValueError as e:
+            return False, str(e), None
+        except Exception as e:
+            return False, f"Error al actualizar precios: {str(e)}", None
+        finally:
+            # Una actualización fallida puede haberse aplicado en parte
+            if not dry_run and self.cache is not None:
+                self.cache.clear()
+        return True, self._mensaje_masivo(resultado, dry_run), resultado
+    
+    def actualizar_stock_masivo(self, filtros, cantidad=None, valor=None, dry_run=False):
+        """
+        Ajusta el stock de todos los productos que cumplen los filtros.
+        
+        Args:
+            filtros (dict): Filtros a aplicar (categoria, precio_min,
+                precio_max); se requiere al menos uno
+            cantidad (int): Unidades a sumar (o restar) al stock
+            valor (int): Nuevo stock absoluto
+            dry_run (bool): Si es True solo se informa qué cambiaría
+            
+        Returns:
+            tuple: (éxito: bool, mensaje: str, resultado: dict o None)
+        """
+        error = self._validar_filtros_masivos(filtros)
+        if error:
+            return False, error, None
+        
+        try:
+            cantidad = int(cantidad) if cantidad not in (None, '') else None
+            valor = int(valor) if valor not in (None, '') else None
+        except (ValueError, TypeError):
+            return False, "El ajuste de stock debe ser un número entero válido", None
+        
+        if (cantidad is None) == (valor is None):
+            return False, "Debe indicar una cantidad o un valor, pero no ambos", None
+        
+        if valor is not None and valor < 0:
+            return False, "El stock no puede ser negativo", None
+        
+        try:
+            resultado = self.model.actualizar_stock(filtros, cantidad=cantidad, valor=valor, dry_run=dry_run)
+        except ValueError as e:
+            return False, str(e), None
+        except Exception as e:
+            return False, f"Error al actualizar stock: {str(e)}", None
+        finally:
+            # Una actualización fallida puede haberse aplicado en parte
+            if not dry_run and self.cache is not None:
+                self.cache.clear()
+        return True, self._mensaje_masivo(resultado, dry_run), resultado
+    
+    def _validar_filtros_masivos(self, filtros):
+        """
+        Valida los filtros de una actualización masiva.
+        
+        Las claves desconocidas se rechazan porque el modelo las ignoraría y
+        la actualización alcanzaría a todo el catálogo. El modelo, además,
+        rechaza los filtros que no generan ninguna condición.
+        
+        Args:
+            filtros (dict): Filtros a validar
+            
+        Returns:
+            str: Mensaje de error o None si los filtros son válidos
+        """
+        if not filtros:
+            return "Debe indicar al menos un filtro"
+        desconocidos = [clave for clave in filtros if clave not in ProductoModel.FILTROS_VALIDOS]
+        if desconocidos:
+            return f"Filtros no válidos: {', '.join(map(str, desconocidos))}"
+        return None
+    
+    def _mensaje_masivo(self, resultado, dry_run):
+        """
+        Construye el mensaje de una actualización masiva.
+        
+        Args:
+            resultado (dict): Resultado devuelto por el modelo
+            dry_run (bool): Si la operación fue una simulación
+            
+        Returns:
+            str: Mensaje para el usuario
+        """
+        if dry_run:
+            return f"Se actualizarían {resultado['afectados']} productos"
+        return f"{resultado['afectados']} productos actualizados exitosamente"
+    
     def eliminar_producto(self, producto_id):
         """
         Elimina un producto.
@@ -177,12 +376,13 @@ class ProductoController:
         except (ValueError, TypeError):
             return False, "El ID debe ser un número válido"
         
-        producto = self.model.buscar_por_id(producto_id)
+        producto = self.model.buscar_por_id(producto_id, campos=['id', 'nombre'])
         if not producto:
             return False, f"No existe un producto con ID {producto_id}"
         
         try:
             if self.model.eliminar(producto_id):
+                self._invalidar_cache(producto_id)
                 return True, f"Producto '{producto['nombre']}' eliminado exitosamente"
             else:
                 return False, "No se pudo eliminar el producto"
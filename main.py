@@ -8,114 +8,173 @@ Flujo de datos MVC:
 4. Modelo → Controlador → Vista → Usuario (retorno de datos)
 """
 
+import argparse
+from contextlib import nullcontext
+
 from model.database import DatabaseConnection
 from controller.producto_controller import ProductoController
 from view.producto_view import ProductoView
+from perfilador import Perfilador
 
+# Nombre de cada opción del menú en los archivos de perfil
+OPERACIONES = {
+    "1": "listar",
+    "2": "agregar",
+    "3": "editar",
+    "4": "eliminar",
+    "5": "consultar",
+    "6": "salir",
+}
 
-def main():
-    """
-    Función principal que inicializa el sistema y maneja el flujo principal.
+
+def _ejecutar_opcion(opcion, controller, view, db):
     """
-    # Inicializar conexión a base de datos (Singleton)
-    db = DatabaseConnection()
-    db.connect()
-    
-    # Inicializar componentes MVC
-    controller = ProductoController()
-    view = ProductoView()
+    Ejecuta la opción del menú seleccionada por el usuario.
     
-    print("Bienvenido al Gestor de Productos EdiCommer")
+    Args:
+        opcion (str): Opción ingresada
+        controller (ProductoController): Controlador de productos
+        view (ProductoView): Vista de productos
+        db (DatabaseConnection): Conexión a la base de datos
+        
+    Returns:
+        bool: False si el usuario eligió salir, True en otro caso
+    """
+    if opcion == "1":
+        # Listar productos
+        productos = controller.listar_productos(campos=view.CAMPOS_LISTADO)
+        view.listar_productos(productos)
+        input("\nPresione Enter para continuar...")
     
-    while True:
-        view.mostrar_menu()
-        opcion = input("\nSeleccione una opción: ").strip()
+    elif opcion == "2":
+        # Agregar producto
+        print("\n--- AGREGAR NUEVO PRODUCTO ---")
+        nombre, precio, categoria, stock = view.solicitar_datos_producto()
+        exito, mensaje, producto_id = controller.agregar_producto(nombre, precio, categoria, stock)
+        
+        if exito:
+            view.mostrar_mensaje(mensaje, "exito")
+        else:
+            view.mostrar_mensaje(mensaje, "error")
         
-        if opcion == "1":
-            # Listar productos
-            productos = controller.listar_productos()
-            view.listar_productos(productos)
-            input("\nPresione Enter para continuar...")
+        input("\nPresione Enter para continuar...")
+    
+    elif opcion == "3":
+        # Editar producto
+        print("\n--- EDITAR PRODUCTO ---")
+        producto_id = view.solicitar_id()
+        producto = controller.obtener_producto(producto_id)
         
-        elif opcion == "2":
-            # Agregar producto
-            print("\n--- AGREGAR NUEVO PRODUCTO ---")
-            nombre, precio, categoria, stock = view.solicitar_datos_producto()
-            exito, mensaje, producto_id = controller.agregar_producto(nombre, precio, categoria, stock)
+        if producto:
+            view.mostrar_producto(producto)
+            print("\nIngrese los nuevos datos (deje en blanco para mantener el valor actual):")
+            
+            nombre = input(f"Nuevo nombre [{producto['nombre']}]: ").strip() or producto['nombre']
+            precio = input(f"Nuevo precio [${producto['precio']}]: ").strip() or producto['precio']
+            categoria = input(f"Nueva categoría [{producto['categoria']}]: ").strip() or producto['categoria']
+            stock = input(f"Nuevo stock [{producto['stock']}]: ").strip() or producto['stock']
+            
+            exito, mensaje = controller.editar_producto(producto_id, nombre, precio, categoria, stock)
             
             if exito:
                 view.mostrar_mensaje(mensaje, "exito")
             else:
                 view.mostrar_mensaje(mensaje, "error")
-            
-            input("\nPresione Enter para continuar...")
+        else:
+            view.mostrar_mensaje(f"No existe un producto con ID {producto_id}", "error")
+        
+        input("\nPresione Enter para continuar...")
+    
+    elif opcion == "4":
+        # Eliminar producto
+        print("\n--- ELIMINAR PRODUCTO ---")
+        producto_id = view.solicitar_id()
+        producto = controller.obtener_producto(producto_id)
         
-        elif opcion == "3":
-            # Editar producto
-            print("\n--- EDITAR PRODUCTO ---")
-            producto_id = view.solicitar_id()
-            producto = controller.obtener_producto(producto_id)
+        if producto:
+            view.mostrar_producto(producto)
+            confirmar = input("\n¿Está seguro de eliminar este producto? (s/n): ").strip().lower()
             
-            if producto:
-                view.mostrar_producto(producto)
-                print("\nIngrese los nuevos datos (deje en blanco para mantener el valor actual):")
-                
-                nombre = input(f"Nuevo nombre [{producto['nombre']}]: ").strip() or producto['nombre']
-                precio = input(f"Nuevo precio [${producto['precio']}]: ").strip() or producto['precio']
-                categoria = input(f"Nueva categoría [{producto['categoria']}]: ").strip() or producto['categoria']
-                stock = input(f"Nuevo stock [{producto['stock']}]: ").strip() or producto['stock']
-                
-                exito, mensaje = controller.editar_producto(producto_id, nombre, precio, categoria, stock)
-                
+            if confirmar == 's':
+                exito, mensaje = controller.eliminar_producto(producto_id)
                 if exito:
                     view.mostrar_mensaje(mensaje, "exito")
                 else:
                     view.mostrar_mensaje(mensaje, "error")
             else:
-                view.mostrar_mensaje(f"No existe un producto con ID {producto_id}", "error")
-            
-            input("\nPresione Enter para continuar...")
+                view.mostrar_mensaje("Operación cancelada", "info")
+        else:
+            view.mostrar_mensaje(f"No existe un producto con ID {producto_id}", "error")
         
-        elif opcion == "4":
-            # Eliminar producto
-            print("\n--- ELIMINAR PRODUCTO ---")
-            producto_id = view.solicitar_id()
-            producto = controller.obtener_producto(producto_id)
-            
-            if producto:
-                view.mostrar_producto(producto)
-                confirmar = input("\n¿Está seguro de eliminar este producto? (s/n): ").strip().lower()
-                
-                if confirmar == 's':
-                    exito, mensaje = controller.eliminar_producto(producto_id)
-                    if exito:
-                        view.mostrar_mensaje(mensaje, "exito")
-                    else:
-                        view.mostrar_mensaje(mensaje, "error")
-                else:
-                    view.mostrar_mensaje("Operación cancelada", "info")
-            else:
-                view.mostrar_mensaje(f"No existe un producto con ID {producto_id}", "error")
-            
-            input("\nPresione Enter para continuar...")
+        input("\nPresione Enter para continuar...")
+    
+    elif opcion == "5":
+        # Consultar producto por ID
+        print("\n--- CONSULTAR PRODUCTO ---")
+        producto_id = view.solicitar_id()
+        producto = controller.obtener_producto(producto_id)
+        view.mostrar_producto(producto)
+        input("\nPresione Enter para continuar...")
+    
+    elif opcion == "6":
+        # Salir
+        print("\n¡Gracias por usar EdiCommer!")
+        db.close()
+        return False
+    
+    else:
+        view.mostrar_mensaje("Opción no válida. Por favor, seleccione una opción del 1 al 6.", "error")
+        input("\nPresione Enter para continuar...")
+    
+    return True
+
+
+def main(argv=None):
+    """
+    Función principal que inicializa el sistema y maneja el flujo principal.
+    
+    Args:
+        argv (list): Argumentos de línea de comandos (por defecto sys.argv)
+    """
+    parser = argparse.ArgumentParser(description="Gestor de Productos EdiCommer")
+    parser.add_argument("--profile", action="store_true",
+                        help="Perfila CPU y memoria de cada operación del menú")
+    parser.add_argument("--profile-dir", default="perfiles",
+                        help="Carpeta donde se guardan los perfiles")
+    args = parser.parse_args(argv)
+    
+    # Inicializar conexión a base de datos (Singleton)
+    db = DatabaseConnection()
+    db.connect()
+    
+    # Inicializar componentes MVC
+    controller = ProductoController()
+    view = ProductoView()
+    
+    perfilador = None
+    if args.profile:
+        perfilador = Perfilador(args.profile_dir)
+        perfilador.envolver(controller, "controlador")
+        perfilador.envolver(controller.model, "modelo")
+        perfilador.envolver(view, "vista", Perfilador.METODOS_RENDERIZADO)
+        print(f"Modo perfilado activo. Los perfiles se guardan en '{args.profile_dir}'")
+    
+    print("Bienvenido al Gestor de Productos EdiCommer")
+    
+    while True:
+        view.mostrar_menu()
+        opcion = input("\nSeleccione una opción: ").strip()
         
-        elif opcion == "5":
-            # Consultar producto por ID
-            print("\n--- CONSULTAR PRODUCTO ---")
-            producto_id = view.solicitar_id()
-            producto = controller.obtener_producto(producto_id)
-            view.mostrar_producto(producto)
-            input("\nPresione Enter para continuar...")
+        if perfilador:
+            medicion = perfilador.operacion(OPERACIONES.get(opcion, "opcion_invalida"))
+        else:
+            medicion = nullcontext()
         
-        elif opcion == "6":
-            # Salir
-            print("\n¡Gracias por usar EdiCommer!")
-            db.close()
-            break
+        with medicion:
+            continuar = _ejecutar_opcion(opcion, controller, view, db)
         
-        else:
-            view.mostrar_mensaje("Opción no válida. Por favor, seleccione una opción del 1 al 6.", "error")
-            input("\nPresione Enter para continuar...")
+        if not continuar:
+            break
 
 
 if __name__ == "__main__":
@@ -72,19 +72,7 @@ class DatabaseConnection:
     
     def _create_tables(self):
         """Crea las tablas necesarias si no existen."""
-        cursor = self._connection.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS productos (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                nombre VARCHAR(255) NOT NULL,
-                precio DECIMAL(10,2) NOT NULL,
-                categoria VARCHAR(100) NOT NULL,
-                stock INT NOT NULL DEFAULT 0,
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-        ''')
-        self._connection.commit()
+        crear_tablas(self._connection)
     
     def get_connection(self):
         """
@@ -106,3 +94,24 @@ class DatabaseConnection:
             self._connection.close()
             self._connection = None
 
+
+def crear_tablas(connection):
+    """
+    Crea las tablas necesarias si no existen en la conexión indicada.
+    
+    Args:
+        connection: Conexión abierta a MySQL
+    """
+    cursor = connection.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS productos (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL,
+            precio DECIMAL(10,2) NOT NULL,
+            categoria VARCHAR(100) NOT NULL,
+            stock INT NOT NULL DEFAULT 0,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    ''')
+    connection.commit()
@@ -0,0 +1,204 @@
+"""
+Módulo de coalescencia de consultas para productos (single-flight).
+
+Cuando varios hilos piden el mismo producto a la vez, solo uno consulta la
+base de datos y el resto espera y comparte su resultado. Opcionalmente, las
+búsquedas por ID de claves distintas que llegan dentro de una ventana corta
+se agrupan en una sola consulta de varias filas.
+
+Las conexiones de mysql.connector no son seguras entre hilos, por lo que las
+consultas de claves distintas se serializan con un lock de base de datos. Si
+varios componentes comparten la misma conexión, deben compartir también ese
+lock (parámetro `lock_bd`).
+"""
+
+import threading
+import time
+
+from model.producto_model import ProductoModel
+
+
+class ErrorConsultaCompartida(Exception):
+    """
+    Error lanzado en los hilos que esperaban una consulta que falló en otro hilo.
+    
+    La excepción original está disponible en `__cause__`.
+    """
+
+
+class _Vuelo:
+    """
+    Consulta en curso compartida por todos los hilos que piden la misma clave.
+    """
+    
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+    
+    def resolver(self, resultado=None, error=None):
+        """
+        Publica el resultado (o el error) y despierta a los hilos en espera.
+        
+        Args:
+            resultado: Valor devuelto por la consulta
+            error (Exception): Excepción lanzada por la consulta, si la hubo
+        """
+        self.resultado = resultado
+        self.error = error
+        self.evento.set()
+    
+    def esperar(self):
+        """
+        Espera a que la consulta termine.
+        
+        Returns:
+            Resultado de la consulta
+        
+        Raises:
+            ErrorConsultaCompartida: Si la consulta falló en el hilo que la ejecutó
+        """
+        self.evento.wait()
+        if self.error is not None:
+            raise ErrorConsultaCompartida(f"La consulta compartida falló: {self.error!r}") from self.error
+        return self.resultado
+
+
+class ProductoCoalescer:
+    """
+    Capa single-flight sobre las búsquedas de ProductoModel.
+    
+    Los resultados se comparten entre todos los hilos que esperaban la misma
+    clave, por lo que los diccionarios devueltos no deben modificarse.
+    """
+    
+    def __init__(self, model=None, ventana_lote_ms=0, lock_bd=None):
+        """
+        Inicializa la capa de coalescencia.
+        
+        Args:
+            model (ProductoModel): Modelo a usar; por defecto se crea uno nuevo
+            ventana_lote_ms (float): Ventana en milisegundos para agrupar
+                búsquedas por ID distintas en una sola consulta; 0 la desactiva
+            lock_bd (threading.Lock): Lock que serializa el acceso a la
+                conexión del modelo; por defecto uno propio
+        """
+        self.model = model or ProductoModel()
+        self.ventana_lote = ventana_lote_ms / 1000.0
+        self._lock = threading.Lock()
+        self._lock_bd = lock_bd or threading.Lock()
+        self._en_vuelo = {}
+        self._lote = None
+    
+    def buscar_por_id(self, producto_id):
+        """
+        Busca un producto por su ID compartiendo la consulta con otros hilos.
+        
+        Args:
+            producto_id (int): ID del producto
+        
+        Returns:
+            dict: Datos del producto o None si no existe
+        """
+        producto_id = int(producto_id)
+        if self.ventana_lote > 0:
+            return self._buscar_en_lote(producto_id)
+        return self._ejecutar(('id', producto_id), lambda: self.model.buscar_por_id(producto_id))
+    
+    def buscar_por_nombre(self, nombre):
+        """
+        Busca un producto por su nombre compartiendo la consulta con otros hilos.
+        
+        Args:
+            nombre (str): Nombre del producto
+        
+        Returns:
+            dict: Datos del producto o None si no existe
+        """
+        return self._ejecutar(('nombre', nombre), lambda: self.model.buscar_por_nombre(nombre))
+    
+    def _ejecutar(self, clave, consulta):
+        """
+        Ejecuta la consulta una sola vez por clave entre los hilos concurrentes.
+        
+        Args:
+            clave (tuple): Identificador de la consulta
+            consulta (callable): Función que consulta la base de datos
+        
+        Returns:
+            Resultado de la consulta
+        
+        Raises:
+            ErrorConsultaCompartida: En los hilos que esperaban, si la consulta
+                falló; el hilo que la ejecutó recibe la excepción original
+        """
+        with self._lock:
+            vuelo = self._en_vuelo.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = _Vuelo()
+                self._en_vuelo[clave] = vuelo
+        
+        if not lider:
+            return vuelo.esperar()
+        
+        resultado, error = None, None
+        try:
+            with self._lock_bd:
+                resultado = consulta()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+            vuelo.resolver(resultado, error)
+        return resultado
+    
+    def _buscar_en_lote(self, producto_id):
+        """
+        Agrupa la búsqueda con las que lleguen dentro de la ventana de lote.
+        
+        El primer hilo de cada ventana espera `ventana_lote` segundos, recoge
+        todos los IDs acumulados y los resuelve con ProductoModel.buscar_por_ids.
+        
+        Args:
+            producto_id (int): ID del producto
+        
+        Returns:
+            dict: Datos del producto o None si no existe
+        """
+        clave = ('id', producto_id)
+        with self._lock:
+            vuelo = self._en_vuelo.get(clave)
+            if vuelo is not None:
+                lider = False
+            else:
+                vuelo = _Vuelo()
+                self._en_vuelo[clave] = vuelo
+                lider = self._lote is None
+                if lider:
+                    self._lote = {}
+                self._lote[producto_id] = vuelo
+        
+        if not lider:
+            return vuelo.esperar()
+        
+        time.sleep(self.ventana_lote)
+        with self._lock:
+            lote, self._lote = self._lote, None
+        
+        encontrados, error = {}, None
+        try:
+            with self._lock_bd:
+                encontrados = self.model.buscar_por_ids(list(lote))
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                for id_lote in lote:
+                    del self._en_vuelo[('id', id_lote)]
+            for id_lote, vuelo_lote in lote.items():
+                vuelo_lote.resolver(encontrados.get(id_lote), error)
+        return encontrados.get(producto_id)
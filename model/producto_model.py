@@ -6,14 +6,104 @@ Maneja el acceso a los datos de productos en la base de datos.
 from model.database import DatabaseConnection
 
 
+class IteradorCursor:
+    """
+    Iterador que lee un cursor por bloques y convierte cada fila en diccionario.
+    
+    Al agotarse o al llamar a close() descarta las filas pendientes y cierra el
+    cursor, de modo que la conexión pueda ejecutar nuevas consultas aunque el
+    recorrido no haya empezado o se haya interrumpido.
+    """
+    
+    def __init__(self, cursor, columns, convertir, tamano_bloque):
+        """
+        Inicializa el iterador.
+        
+        Args:
+            cursor: Cursor con la consulta ya ejecutada
+            columns (list): Nombres de las columnas
+            convertir (callable): Función (columns, fila) -> dict
+            tamano_bloque (int): Filas por fetchmany
+        """
+        self._cursor = cursor
+        self._columns = columns
+        self._convertir = convertir
+        self._tamano_bloque = tamano_bloque
+        self._bloque = iter(())
+        self._agotado = False
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        for fila in self._bloque:
+            return self._convertir(self._columns, fila)
+        if self._cursor is None:
+            raise StopIteration
+        filas = self._cursor.fetchmany(self._tamano_bloque)
+        if not filas:
+            self._agotado = True
+            self.close()
+            raise StopIteration
+        self._bloque = iter(filas)
+        return self._convertir(self._columns, next(self._bloque))
+    
+    def close(self):
+        """Descarta las filas pendientes y cierra el cursor (idempotente)."""
+        cursor, self._cursor = self._cursor, None
+        self._bloque = iter(())
+        if cursor is None:
+            return
+        try:
+            if not self._agotado:
+                cursor.fetchall()
+        finally:
+            cursor.close()
+
+
 class ProductoModel:
     """
     Modelo que gestiona las operaciones de base de datos para productos.
     """
     
-    def __init__(self):
-        db = DatabaseConnection()
-        self.conn = db.get_connection()
+    # Columnas que se pueden proyectar en las consultas de lectura
+    CAMPOS_PROYECTABLES = (
+        'id', 'nombre', 'precio', 'categoria', 'stock',
+        'fecha_creacion', 'ultima_actualizacion'
+    )
+    
+    # Claves reconocidas en el diccionario de filtros
+    FILTROS_VALIDOS = ('categoria', 'marca', 'precio_min', 'precio_max', 'stock_bajo', 'en_oferta')
+    
+    # Filtros que dependen de columnas que la tabla productos no define
+    # (ver crear_tablas); las actualizaciones masivas los rechazan
+    FILTROS_SIN_COLUMNA = {'marca': 'marca', 'stock_bajo': 'stock_minimo', 'en_oferta': 'precio_oferta'}
+    
+    # Máximo de IDs por cláusula IN en las búsquedas múltiples
+    TAMANO_LOTE_IDS = 500
+    
+    # Filas leídas por cada fetchmany al recorrer un listado
+    TAMANO_BLOQUE = 500
+    
+    # Columnas por las que se permite ordenar los listados
+    CAMPOS_ORDENABLES = ('id', 'nombre', 'precio', 'categoria', 'stock', 'marca', 'ultima_actualizacion')
+    
+    # Columnas de texto, que se ordenan según la intercalación de la tabla
+    CAMPOS_TEXTO = ('nombre', 'categoria', 'marca', 'codigo_sku')
+    
+    # Columna con el peso de intercalación (WEIGHT_STRING) del campo de orden
+    COLUMNA_PESO = '_peso_orden'
+    
+    def __init__(self, conn=None):
+        """
+        Inicializa el modelo.
+        
+        Args:
+            conn: Conexión a usar; por defecto la del Singleton DatabaseConnection
+        """
+        if conn is None:
+            conn = DatabaseConnection().get_connection()
+        self.conn = conn
     
     def _row_to_dict(self, columns, row):
         """
@@ -30,83 +120,213 @@ class ProductoModel:
             return None
         return dict(zip(columns, row))
     
-    def listar_todos(self, orden_por='nombre', direccion='ASC', filtros=None):
+    def _columnas_select(self, campos):
         """
-        Obtiene todos los productos de la base de datos con opciones de ordenamiento y filtrado.
+        Construye la lista de columnas para la cláusula SELECT.
         
         Args:
-            orden_por (str): Campo por el cual ordenar ('nombre', 'precio', 'stock', etc.)
-            direccion (str): Dirección del ordenamiento ('ASC' o 'DESC')
-            filtros (dict): Diccionario con filtros a aplicar
-                {
-                    'categoria': str,
-                    'marca': str,
-                    'precio_min': float,
-                    'precio_max': float,
-                    'stock_bajo': bool,
-                    'en_oferta': bool
-                }
-        
+            campos (list): Columnas a proyectar o None para todas
+            
         Returns:
-            list: Lista de diccionarios con los productos
+            str: Columnas separadas por comas o '*' si no se indican campos
+        
+        Raises:
+            ValueError: Si algún campo no es una columna de la tabla
         """
-        cursor = self.conn.cursor()
+        if not campos:
+            return '*'
+        desconocidos = [campo for campo in campos if campo not in self.CAMPOS_PROYECTABLES]
+        if desconocidos:
+            raise ValueError(f"Columnas no válidas: {', '.join(map(str, desconocidos))}")
+        return ', '.join(dict.fromkeys(campos))
+    
+    def _construir_filtros(self, filtros):
+        """
+        Construye las condiciones WHERE a partir de un diccionario de filtros.
         
-        # Construir la consulta base
-        query = 'SELECT * FROM productos WHERE 1=1'
+        Args:
+            filtros (dict): Filtros a aplicar (ver listar_todos)
+            
+        Returns:
+            tuple: (condiciones: str, params: list)
+        """
+        condiciones = ''
         params = []
         
-        # Aplicar filtros si existen
         if filtros:
             if 'categoria' in filtros and filtros['categoria']:
-                query += ' AND categoria = %s'
+                condiciones += ' AND categoria = %s'
                 params.append(filtros['categoria'])
             
             if 'marca' in filtros and filtros['marca']:
-                query += ' AND marca = %s'
+                condiciones += ' AND marca = %s'
                 params.append(filtros['marca'])
             
             if 'precio_min' in filtros and filtros['precio_min'] is not None:
-                query += ' AND precio >= %s'
+                condiciones += ' AND precio >= %s'
                 params.append(float(filtros['precio_min']))
             
             if 'precio_max' in filtros and filtros['precio_max'] is not None:
-                query += ' AND precio <= %s'
+                condiciones += ' AND precio <= %s'
                 params.append(float(filtros['precio_max']))
             
             if 'stock_bajo' in filtros and filtros['stock_bajo']:
-                query += ' AND stock <= stock_minimo'
+                condiciones += ' AND stock <= stock_minimo'
             
             if 'en_oferta' in filtros and filtros['en_oferta']:
-                query += ' AND precio_oferta IS NOT NULL'
+                condiciones += ' AND precio_oferta IS NOT NULL'
         
-        # Validar y aplicar ordenamiento
-        campos_validos = ['id', 'nombre', 'precio', 'categoria', 'stock', 'marca', 'ultima_actualizacion']
-        if orden_por not in campos_validos:
-            orden_por = 'nombre'
+        return condiciones, params
+    
+    def listar_todos(self, orden_por='nombre', direccion='ASC', filtros=None, campos=None, incluir_peso=False):
+        """
+        Obtiene todos los productos de la base de datos con opciones de ordenamiento y filtrado.
         
-        direccion = 'ASC' if direccion.upper() not in ['ASC', 'DESC'] else direccion.upper()
+        Args:
+            orden_por (str): Campo por el cual ordenar ('nombre', 'precio', 'stock', etc.)
+            direccion (str): Dirección del ordenamiento ('ASC' o 'DESC')
+            filtros (dict): Diccionario con filtros a aplicar
+                {
+                    'categoria': str,
+                    'marca': str,
+                    'precio_min': float,
+                    'precio_max': float,
+                    'stock_bajo': bool,
+                    'en_oferta': bool
+                }
+            campos (list): Columnas a devolver; None devuelve todas
+            incluir_peso (bool): Si se ordena por un campo de texto, añade la
+                columna COLUMNA_PESO con su WEIGHT_STRING, cuyos bytes se
+                comparan en el mismo orden que la intercalación de la tabla
         
-        query += f' ORDER BY {orden_por} {direccion}'
+        Returns:
+            list: Lista de diccionarios con los productos
+        """
+        cursor = self.conn.cursor()
+        query, params = self._consulta_listado(orden_por, direccion, filtros, campos, incluir_peso)
         
         # Ejecutar consulta
         cursor.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
         productos = cursor.fetchall()
         return [self._row_to_dict(columns, producto) for producto in productos]
+    
+    def iterar_todos(self, orden_por='nombre', direccion='ASC', filtros=None, campos=None,
+                     incluir_peso=False, tamano_bloque=None):
+        """
+        Ejecuta la consulta de listar_todos y devuelve un iterador que lee
+        las filas por bloques con fetchmany, sin cargarlas todas en memoria.
+        
+        La consulta se ejecuta al llamar al método; las filas se leen a medida
+        que se recorre el iterador. La conexión queda ocupada hasta que el
+        iterador se agota o se cierra, aunque no se haya empezado a recorrer.
+        
+        Args:
+            orden_por, direccion, filtros, campos, incluir_peso: Ver listar_todos
+            tamano_bloque (int): Filas por fetchmany (por defecto TAMANO_BLOQUE)
+            
+        Returns:
+            IteradorCursor: Iterador de diccionarios con los productos
+        """
+        cursor = self.conn.cursor()
+        query, params = self._consulta_listado(orden_por, direccion, filtros, campos, incluir_peso)
+        cursor.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        return IteradorCursor(cursor, columns, self._row_to_dict, tamano_bloque or self.TAMANO_BLOQUE)
+    
+    def _consulta_listado(self, orden_por, direccion, filtros, campos, incluir_peso):
+        """
+        Construye la consulta SELECT de los listados (ver listar_todos).
+        
+        Returns:
+            tuple: (query: str, params: list)
+        """
+        # Validar el ordenamiento
+        if orden_por not in self.CAMPOS_ORDENABLES:
+            orden_por = 'nombre'
+        
+        direccion = 'ASC' if direccion.upper() not in ['ASC', 'DESC'] else direccion.upper()
+        
+        # Construir la consulta base
+        columnas = self._columnas_select(campos)
+        if incluir_peso and orden_por in self.CAMPOS_TEXTO:
+            columnas += f', WEIGHT_STRING({orden_por}) AS {self.COLUMNA_PESO}'
+        query = f'SELECT {columnas} FROM productos WHERE 1=1'
+        
+        # Aplicar filtros si existen
+        condiciones, params = self._construir_filtros(filtros)
+        query += condiciones
+        
+        query += f' ORDER BY {orden_por} {direccion}'
+        
+        return query, params
+    
+    def contar_productos(self, filtros=None):
+        """
+        Cuenta los productos que cumplen los filtros sin transferir las filas.
+        
+        Args:
+            filtros (dict): Filtros a aplicar (mismo formato que listar_todos)
+            
+        Returns:
+            int: Cantidad de productos
+        """
+        cursor = self.conn.cursor()
+        condiciones, params = self._construir_filtros(filtros)
+        cursor.execute('SELECT COUNT(*) FROM productos WHERE 1=1' + condiciones, params)
+        return cursor.fetchone()[0]
+    
+    def existe_id(self, producto_id):
+        """
+        Verifica si existe un producto con el ID indicado.
+        
+        Args:
+            producto_id (int): ID del producto
+            
+        Returns:
+            bool: True si existe
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT 1 FROM productos WHERE id = %s LIMIT 1', (producto_id,))
+        return cursor.fetchone() is not None
+    
+    def existe_nombre(self, nombre, excluir_id=None):
+        """
+        Verifica si existe un producto con el nombre indicado.
+        
+        Args:
+            nombre (str): Nombre del producto
+            excluir_id (int): ID de un producto a ignorar en la comprobación
+            
+        Returns:
+            bool: True si existe
+        """
+        cursor = self.conn.cursor()
+        if excluir_id is None:
+            cursor.execute('SELECT 1 FROM productos WHERE nombre = %s LIMIT 1', (nombre,))
+        else:
+            cursor.execute(
+                'SELECT 1 FROM productos WHERE nombre = %s AND id <> %s LIMIT 1',
+                (nombre, excluir_id)
+            )
+        return cursor.fetchone() is not None
         
-    def buscar_por_sku(self, sku):
+    def buscar_por_sku(self, sku, campos=None):
         """
         Busca un producto por su SKU.
         
         Args:
             sku (str): Código SKU del producto
+            campos (list): Columnas a devolver; None devuelve todas
             
         Returns:
             dict: Datos del producto o None si no existe
         """
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM productos WHERE codigo_sku = %s', (sku,))
+        cursor.execute(
+            f'SELECT {self._columnas_select(campos)} FROM productos WHERE codigo_sku = %s',
+            (sku,)
+        )
         columns = [desc[0] for desc in cursor.description]
         producto = cursor.fetchone()
         return self._row_to_dict(columns, producto)
@@ -141,34 +361,79 @@ class ProductoModel:
         """
         return self.listar_todos(filtros={'en_oferta': True})
     
-    def buscar_por_id(self, producto_id):
+    def buscar_por_id(self, producto_id, campos=None):
         """
         Busca un producto por su ID.
         
         Args:
             producto_id (int): ID del producto
+            campos (list): Columnas a devolver; None devuelve todas
             
         Returns:
             dict: Datos del producto o None si no existe
         """
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM productos WHERE id = %s', (producto_id,))
+        cursor.execute(
+            f'SELECT {self._columnas_select(campos)} FROM productos WHERE id = %s',
+            (producto_id,)
+        )
         columns = [desc[0] for desc in cursor.description]
         producto = cursor.fetchone()
         return self._row_to_dict(columns, producto)
     
-    def buscar_por_nombre(self, nombre):
+    def buscar_por_ids(self, producto_ids, campos=None, tamano_lote=None):
+        """
+        Busca varios productos por sus IDs usando consultas IN por lotes.
+        
+        Args:
+            producto_ids (iterable): IDs de los productos (se eliminan duplicados)
+            campos (list): Columnas a devolver; None devuelve todas
+            tamano_lote (int): Máximo de IDs por consulta (por defecto TAMANO_LOTE_IDS)
+            
+        Returns:
+            dict: Diccionario {id: producto}; los IDs inexistentes no aparecen
+        """
+        ids = list(dict.fromkeys(producto_ids))
+        if not ids:
+            return {}
+        
+        # El id es necesario para construir el diccionario de resultados
+        if campos and 'id' not in campos:
+            campos = ['id'] + list(campos)
+        columnas = self._columnas_select(campos)
+        tamano_lote = tamano_lote or self.TAMANO_LOTE_IDS
+        
+        productos = {}
+        cursor = self.conn.cursor()
+        for inicio in range(0, len(ids), tamano_lote):
+            lote = ids[inicio:inicio + tamano_lote]
+            marcadores = ', '.join(['%s'] * len(lote))
+            cursor.execute(
+                f'SELECT {columnas} FROM productos WHERE id IN ({marcadores})',
+                lote
+            )
+            columns = [desc[0] for desc in cursor.description]
+            for fila in cursor.fetchall():
+                producto = self._row_to_dict(columns, fila)
+                productos[producto['id']] = producto
+        return productos
+    
+    def buscar_por_nombre(self, nombre, campos=None):
         """
         Busca un producto por su nombre.
         
         Args:
             nombre (str): Nombre del producto
+            campos (list): Columnas a devolver; None devuelve todas
             
         Returns:
             dict: Datos del producto o None si no existe
         """
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM productos WHERE nombre = %s', (nombre,))
+        cursor.execute(
+            f'SELECT {self._columnas_select(campos)} FROM productos WHERE nombre = %s',
+            (nombre,)
+        )
         columns = [desc[0] for desc in cursor.description]
         producto = cursor.fetchone()
         return self._row_to_dict(columns, producto)
@@ -221,6 +486,129 @@ class ProductoModel:
         self.conn.commit()
         return cursor.rowcount > 0
     
+    def actualizar_precios(self, filtros=None, porcentaje=None, monto=None, dry_run=False, limite_vista_previa=10,
+                           permitir_sin_filtros=False):
+        """
+        Ajusta el precio de todos los productos que cumplen los filtros en una
+        sola sentencia UPDATE. Los precios resultantes nunca son negativos.
+        
+        Args:
+            filtros (dict): Filtros a aplicar (mismo formato que listar_todos)
+            porcentaje (float): Variación porcentual del precio (8 = +8%)
+            monto (float): Variación absoluta del precio
+            dry_run (bool): Si es True no modifica nada y devuelve una vista previa
+            limite_vista_previa (int): Máximo de productos en la vista previa
+            permitir_sin_filtros (bool): Permite actualizar todo el catálogo
+                cuando los filtros no generan ninguna condición
+            
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}; 'afectados' cuenta
+                los productos cuyo precio cambia, igual con y sin dry_run
+            
+        Raises:
+            ValueError: Si no se indica exactamente uno de porcentaje o monto,
+                o si no hay filtros y no se permite actualizar sin ellos
+        """
+        if (porcentaje is None) == (monto is None):
+            raise ValueError("Debe indicar un porcentaje o un monto, pero no ambos")
+        if porcentaje is not None:
+            expresion, valor = 'GREATEST(ROUND(precio * (1 + %s / 100), 2), 0)', float(porcentaje)
+        else:
+            expresion, valor = 'GREATEST(ROUND(precio + %s, 2), 0)', float(monto)
+        return self._actualizar_masivo('precio', expresion, valor, filtros, dry_run, limite_vista_previa,
+                                       permitir_sin_filtros)
+    
+    def actualizar_stock(self, filtros=None, cantidad=None, valor=None, dry_run=False, limite_vista_previa=10,
+                         permitir_sin_filtros=False):
+        """
+        Ajusta el stock de todos los productos que cumplen los filtros en una
+        sola sentencia UPDATE. El stock resultante nunca es negativo.
+        
+        Args:
+            filtros (dict): Filtros a aplicar (mismo formato que listar_todos)
+            cantidad (int): Unidades a sumar (o restar, si es negativa) al stock
+            valor (int): Nuevo stock absoluto
+            dry_run (bool): Si es True no modifica nada y devuelve una vista previa
+            limite_vista_previa (int): Máximo de productos en la vista previa
+            permitir_sin_filtros (bool): Permite actualizar todo el catálogo
+                cuando los filtros no generan ninguna condición
+            
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}; 'afectados' cuenta
+                los productos cuyo stock cambia, igual con y sin dry_run
+            
+        Raises:
+            ValueError: Si no se indica exactamente uno de cantidad o valor,
+                o si no hay filtros y no se permite actualizar sin ellos
+        """
+        if (cantidad is None) == (valor is None):
+            raise ValueError("Debe indicar una cantidad o un valor, pero no ambos")
+        if cantidad is not None:
+            expresion, parametro = 'GREATEST(stock + %s, 0)', int(cantidad)
+        else:
+            expresion, parametro = 'GREATEST(%s, 0)', int(valor)
+        return self._actualizar_masivo('stock', expresion, parametro, filtros, dry_run, limite_vista_previa,
+                                       permitir_sin_filtros)
+    
+    def _actualizar_masivo(self, columna, expresion, valor, filtros, dry_run, limite_vista_previa,
+                           permitir_sin_filtros=False):
+        """
+        Aplica `columna = expresion` a los productos que cumplen los filtros.
+        
+        Solo se tienen en cuenta las filas cuyo valor cambia, tanto en el
+        UPDATE como en el dry_run. Así el número de afectados es el mismo en
+        ambos casos y coincide con cursor.rowcount de MySQL, que no cuenta las
+        filas sin cambios salvo que la conexión use CLIENT_FOUND_ROWS.
+        
+        Args:
+            columna (str): Columna a modificar
+            expresion (str): Expresión SQL con un único marcador %s para valor
+            valor: Parámetro de la expresión
+            filtros (dict): Filtros a aplicar
+            dry_run (bool): Si es True solo cuenta y genera la vista previa
+            limite_vista_previa (int): Máximo de productos en la vista previa
+            permitir_sin_filtros (bool): Permite un UPDATE sin condiciones
+            
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}
+            
+        Raises:
+            ValueError: Si algún filtro depende de una columna que la tabla no
+                tiene, o si los filtros no generan ninguna condición y no se
+                permite actualizar sin ellos
+        """
+        for filtro, columna_filtro in self.FILTROS_SIN_COLUMNA.items():
+            if filtros and filtros.get(filtro):
+                raise ValueError(
+                    f"El filtro '{filtro}' requiere la columna '{columna_filtro}', "
+                    f"que la tabla productos no tiene"
+                )
+        condiciones, params = self._construir_filtros(filtros)
+        if not condiciones and not permitir_sin_filtros:
+            raise ValueError("Debe indicar al menos un filtro")
+        condiciones += f' AND {columna} <> {expresion}'
+        params = params + [valor]
+        cursor = self.conn.cursor()
+        
+        if not dry_run:
+            cursor.execute(
+                f'UPDATE productos SET {columna} = {expresion} WHERE 1=1' + condiciones,
+                [valor] + params
+            )
+            self.conn.commit()
+            return {'afectados': cursor.rowcount, 'vista_previa': []}
+        
+        cursor.execute('SELECT COUNT(*) FROM productos WHERE 1=1' + condiciones, params)
+        afectados = cursor.fetchone()[0]
+        cursor.execute(
+            f'SELECT id, nombre, {columna} AS valor_actual, {expresion} AS valor_nuevo '
+            f'FROM productos WHERE 1=1{condiciones} ORDER BY id LIMIT %s',
+            [valor] + params + [int(limite_vista_previa)]
+        )
+        columns = [desc[0] for desc in cursor.description]
+        vista_previa = [self._row_to_dict(columns, fila) for fila in cursor.fetchall()]
+        return {'afectados': afectados, 'vista_previa': vista_previa}
+    
     def eliminar(self, producto_id):
         """
         Elimina un producto de la base de datos.
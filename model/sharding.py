@@ -0,0 +1,591 @@
+"""
+Módulo de sharding de productos entre varias instancias de base de datos.
+
+Cada shard es una instancia MySQL independiente con su propia tabla
+`productos`. Los IDs se generan con AUTO_INCREMENT intercalado
+(auto_increment_increment = número de shards, auto_increment_offset = posición
+del shard + 1), de modo que el shard de cualquier producto se obtiene a partir
+de su ID sin consultar ninguna tabla adicional.
+
+Los productos nuevos se asignan a un shard según la tabla de ruteo por
+categoría (o un hash estable de la categoría si no figura en ella), o bien de
+forma rotativa si la estrategia es 'id'. Los listados consultan todos los
+shards en paralelo y mezclan los resultados ya ordenados.
+
+El número y el orden de los shards registrados no deben cambiar una vez que
+existan datos, ya que el ID de cada producto depende de ellos. Al registrar
+un shard se comprueba que los IDs de todos los shards sigan el intercalado y
+se rechaza el registro si no es así (ver la migración en docs/database.md).
+Las variables de sesión se vuelven a fijar antes de cada alta, por lo que una
+reconexión del driver no rompe el intercalado, y el ID generado se comprueba
+después de insertarlo.
+
+Solo se admite MySQL: el intercalado de IDs usa variables de sesión de MySQL
+y las consultas usan el estilo de parámetros %s. Para probarlo en local se
+pueden levantar varias instancias MySQL y ejecutar verificar_sharding.py.
+"""
+
+import heapq
+import itertools
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from model.database import crear_tablas
+from model.producto_model import ProductoModel
+
+
+class ErrorActualizacionParcial(Exception):
+    """
+    Error de una actualización masiva que falló en algunos shards después de
+    haberse confirmado en otros.
+    """
+    
+    def __init__(self, aplicados, fallidos):
+        """
+        Args:
+            aplicados (dict): Diccionario {nombre_shard: productos afectados}
+                de los shards donde la actualización se confirmó
+            fallidos (dict): Diccionario {nombre_shard: excepción}
+        """
+        self.aplicados = aplicados
+        self.fallidos = fallidos
+        detalle_fallidos = '; '.join(f"{nombre}: {error}" for nombre, error in fallidos.items())
+        detalle_aplicados = ', '.join(
+            f"{nombre} ({afectados} productos)" for nombre, afectados in aplicados.items()
+        ) or 'ninguno'
+        super().__init__(
+            f"La actualización falló en {detalle_fallidos}. Ya se aplicó en: {detalle_aplicados}"
+        )
+
+
+class GestorShards:
+    """
+    Registro de shards y tabla de ruteo de productos.
+    """
+    
+    ESTRATEGIAS = ('categoria', 'id')
+    
+    def __init__(self, estrategia='categoria', tabla_ruteo=None):
+        """
+        Inicializa el gestor sin shards registrados.
+        
+        Args:
+            estrategia (str): 'categoria' para rutear las altas por categoría
+                o 'id' para repartirlas de forma rotativa
+            tabla_ruteo (dict): Diccionario {categoria: nombre_shard}
+        """
+        if estrategia not in self.ESTRATEGIAS:
+            raise ValueError(f"Estrategia de sharding no válida: {estrategia}")
+        self.estrategia = estrategia
+        self.tabla_ruteo = dict(tabla_ruteo or {})
+        self._nombres = []
+        self._modelos = {}
+        self._rotacion = itertools.count()
+    
+    def registrar_shard(self, nombre, config=None, conexion=None):
+        """
+        Registra un shard a partir de su configuración o de una conexión abierta.
+        
+        Args:
+            nombre (str): Nombre único del shard
+            config (dict): Parámetros para mysql.connector.connect
+            conexion: Conexión MySQL ya abierta (por ejemplo, a una instancia local)
+        
+        Raises:
+            ValueError: Si el shard ya está registrado o si algún shard contiene
+                IDs que no corresponden a su posición con el nuevo número de shards
+        """
+        if nombre in self._modelos:
+            raise ValueError(f"El shard '{nombre}' ya está registrado")
+        abierta_aqui = conexion is None
+        if abierta_aqui:
+            if config is None:
+                raise ValueError("Se requiere config o conexion para registrar un shard")
+            conexion = mysql.connector.connect(**config)
+            crear_tablas(conexion)
+        
+        nombres = self._nombres + [nombre]
+        modelos = {**self._modelos, nombre: ProductoModel(conn=conexion)}
+        try:
+            for nombre_shard in nombres:
+                self._verificar_intercalado(nombre_shard, modelos[nombre_shard], nombres)
+        except Exception:
+            if abierta_aqui:
+                conexion.close()
+            raise
+        
+        self._nombres = nombres
+        self._modelos = modelos
+        for nombre_shard in nombres:
+            self.configurar_autoincremento(nombre_shard)
+    
+    def _verificar_intercalado(self, nombre, modelo, nombres):
+        """
+        Comprueba que todos los IDs de un shard correspondan a su posición.
+        
+        Args:
+            nombre (str): Nombre del shard
+            modelo (ProductoModel): Modelo ligado a la conexión del shard
+            nombres (list): Nombres de todos los shards en orden de registro
+        
+        Raises:
+            ValueError: Si el shard contiene un ID que corresponde a otro shard
+        """
+        cursor = modelo.conn.cursor()
+        cursor.execute(
+            'SELECT id FROM productos WHERE MOD(id - %s, %s) <> 0 LIMIT 1',
+            (nombres.index(nombre) + 1, len(nombres))
+        )
+        fila = cursor.fetchone()
+        cursor.close()
+        if fila is not None:
+            raise ValueError(
+                f"El shard '{nombre}' contiene el ID {fila[0]}, que con {len(nombres)} shards "
+                f"corresponde a '{nombres[(fila[0] - 1) % len(nombres)]}'. "
+                f"Migra los datos antes de registrarlo (ver docs/database.md)"
+            )
+    
+    def configurar_autoincremento(self, nombre):
+        """
+        Fija en la sesión del shard el intercalado de AUTO_INCREMENT según su posición.
+        
+        Args:
+            nombre (str): Nombre del shard
+        """
+        cursor = self.modelo(nombre).conn.cursor()
+        cursor.execute(
+            'SET SESSION auto_increment_increment = %s, auto_increment_offset = %s',
+            (len(self._nombres), self._nombres.index(nombre) + 1)
+        )
+        cursor.close()
+    
+    @property
+    def nombres(self):
+        """list: Nombres de los shards en orden de registro."""
+        return list(self._nombres)
+    
+    def modelo(self, nombre):
+        """
+        Obtiene el modelo asociado a un shard.
+        
+        Args:
+            nombre (str): Nombre del shard
+        
+        Returns:
+            ProductoModel: Modelo ligado a la conexión del shard
+        
+        Raises:
+            ValueError: Si el shard no está registrado
+        """
+        if nombre not in self._modelos:
+            raise ValueError(f"El shard '{nombre}' no está registrado")
+        return self._modelos[nombre]
+    
+    def modelos(self):
+        """
+        Obtiene los modelos de todos los shards.
+        
+        Returns:
+            list: Modelos en orden de registro
+        """
+        return [self._modelos[nombre] for nombre in self._nombres]
+    
+    def shard_para_id(self, producto_id):
+        """
+        Obtiene el shard que contiene un producto a partir de su ID.
+        
+        Args:
+            producto_id (int): ID del producto
+        
+        Returns:
+            str: Nombre del shard
+        """
+        self._verificar_shards()
+        return self._nombres[(int(producto_id) - 1) % len(self._nombres)]
+    
+    def shard_para_alta(self, categoria):
+        """
+        Obtiene el shard donde se creará un producto nuevo.
+        
+        Args:
+            categoria (str): Categoría del producto
+        
+        Returns:
+            str: Nombre del shard
+        """
+        self._verificar_shards()
+        self.validar_tabla_ruteo()
+        if self.estrategia == 'id':
+            return self._nombres[next(self._rotacion) % len(self._nombres)]
+        if categoria in self.tabla_ruteo:
+            return self.tabla_ruteo[categoria]
+        indice = zlib.crc32(categoria.encode('utf-8')) % len(self._nombres)
+        return self._nombres[indice]
+    
+    def validar_tabla_ruteo(self):
+        """
+        Verifica que todos los shards de la tabla de ruteo estén registrados.
+        
+        Raises:
+            ValueError: Si alguna categoría apunta a un shard no registrado
+        """
+        desconocidos = sorted(set(self.tabla_ruteo.values()) - set(self._nombres))
+        if desconocidos:
+            raise ValueError(
+                f"La tabla de ruteo usa shards no registrados: {', '.join(desconocidos)}"
+            )
+    
+    def _verificar_shards(self):
+        """Lanza una excepción si no hay shards registrados."""
+        if not self._nombres:
+            raise Exception("No hay shards registrados. Llama a registrar_shard() primero.")
+    
+    def close(self):
+        """Cierra las conexiones de todos los shards."""
+        for modelo in self._modelos.values():
+            modelo.conn.close()
+        self._nombres = []
+        self._modelos = {}
+
+
+class ProductoModelShardeado:
+    """
+    Modelo de productos con la misma interfaz que ProductoModel, distribuido
+    entre los shards de un GestorShards.
+    """
+    
+    def __init__(self, gestor):
+        """
+        Inicializa el modelo.
+        
+        Args:
+            gestor (GestorShards): Gestor con los shards registrados
+        
+        Raises:
+            ValueError: Si la tabla de ruteo usa shards no registrados
+        """
+        gestor.validar_tabla_ruteo()
+        self.gestor = gestor
+    
+    def _en_todos(self, operacion, liberar=None):
+        """
+        Ejecuta una operación en todos los shards en paralelo.
+        
+        Si falla en algún shard, se espera al resto, se libera cada resultado
+        obtenido con `liberar` y se relanza la primera excepción.
+        
+        Args:
+            operacion (callable): Función que recibe un ProductoModel
+            liberar (callable): Función que libera un resultado (por ejemplo,
+                cerrando un iterador) cuando otro shard falla
+        
+        Returns:
+            list: Resultados en orden de registro de los shards
+        """
+        modelos = self.gestor.modelos()
+        if len(modelos) <= 1:
+            return [operacion(modelo) for modelo in modelos]
+        with ThreadPoolExecutor(max_workers=len(modelos)) as executor:
+            futuros = [executor.submit(operacion, modelo) for modelo in modelos]
+        
+        resultados, error = [], None
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            if liberar is not None:
+                for resultado in resultados:
+                    liberar(resultado)
+            raise error
+        return resultados
+    
+    def iterar_todos(self, orden_por='nombre', direccion='ASC', filtros=None, campos=None):
+        """
+        Recorre los productos de todos los shards mezclados en orden.
+        
+        Las consultas a los shards se ejecutan en paralelo y sus resultados,
+        ya ordenados por la base de datos, se leen por bloques de cada cursor
+        y se combinan con una mezcla k-way a medida que se recorren. Las
+        conexiones de los shards quedan ocupadas hasta que se agota o se
+        cierra el iterador.
+        
+        Cada shard ordena con la intercalación de la tabla. Para los campos de
+        texto, cada shard devuelve además el WEIGHT_STRING del campo, y la
+        mezcla compara esos bytes en lugar de las cadenas, de modo que el
+        orden coincide con el de un listado sin sharding.
+        
+        Args:
+            orden_por (str): Campo por el cual ordenar
+            direccion (str): Dirección del ordenamiento ('ASC' o 'DESC')
+            filtros (dict): Filtros a aplicar (ver ProductoModel.listar_todos)
+            campos (list): Columnas a devolver; None devuelve todas
+        
+        Yields:
+            dict: Productos en el orden solicitado
+        """
+        if orden_por not in ProductoModel.CAMPOS_ORDENABLES:
+            orden_por = 'nombre'
+        descendente = direccion.upper() == 'DESC'
+        
+        # El campo de ordenamiento es necesario para la mezcla
+        if campos and orden_por not in campos:
+            campos = list(campos) + [orden_por]
+        
+        iteradores = self._en_todos(
+            lambda modelo: modelo.iterar_todos(orden_por, direccion, filtros, campos, incluir_peso=True),
+            liberar=lambda iterador: iterador.close()
+        )
+        
+        columna_peso = ProductoModel.COLUMNA_PESO
+        
+        def clave(producto):
+            valor = producto.get(columna_peso, producto[orden_por])
+            return (valor is not None, valor)
+        
+        try:
+            for producto in heapq.merge(*iteradores, key=clave, reverse=descendente):
+                producto.pop(columna_peso, None)
+                yield producto
+        finally:
+            for iterador in iteradores:
+                iterador.close()
+    
+    def listar_todos(self, orden_por='nombre', direccion='ASC', filtros=None, campos=None):
+        """
+        Obtiene los productos de todos los shards (ver iterar_todos).
+        
+        Returns:
+            list: Lista de diccionarios con los productos
+        """
+        return list(self.iterar_todos(orden_por, direccion, filtros, campos))
+    
+    def contar_productos(self, filtros=None):
+        """
+        Cuenta los productos de todos los shards que cumplen los filtros.
+        
+        Args:
+            filtros (dict): Filtros a aplicar
+        
+        Returns:
+            int: Cantidad de productos
+        """
+        return sum(self._en_todos(lambda modelo: modelo.contar_productos(filtros)))
+    
+    def buscar_por_id(self, producto_id, campos=None):
+        """
+        Busca un producto por su ID en el shard que le corresponde.
+        
+        Args:
+            producto_id (int): ID del producto
+            campos (list): Columnas a devolver; None devuelve todas
+        
+        Returns:
+            dict: Datos del producto o None si no existe
+        """
+        modelo = self.gestor.modelo(self.gestor.shard_para_id(producto_id))
+        return modelo.buscar_por_id(producto_id, campos)
+    
+    def buscar_por_ids(self, producto_ids, campos=None, tamano_lote=None):
+        """
+        Busca varios productos agrupando los IDs por shard.
+        
+        Args:
+            producto_ids (iterable): IDs de los productos
+            campos (list): Columnas a devolver; None devuelve todas
+            tamano_lote (int): Máximo de IDs por consulta
+        
+        Returns:
+            dict: Diccionario {id: producto}
+        """
+        por_shard = {}
+        for producto_id in dict.fromkeys(producto_ids):
+            por_shard.setdefault(self.gestor.shard_para_id(producto_id), []).append(producto_id)
+        
+        productos = {}
+        for nombre, ids in por_shard.items():
+            productos.update(self.gestor.modelo(nombre).buscar_por_ids(ids, campos, tamano_lote))
+        return productos
+    
+    def buscar_por_nombre(self, nombre, campos=None):
+        """
+        Busca un producto por su nombre en todos los shards.
+        
+        Args:
+            nombre (str): Nombre del producto
+            campos (list): Columnas a devolver; None devuelve todas
+        
+        Returns:
+            dict: Datos del producto o None si no existe
+        """
+        for producto in self._en_todos(lambda modelo: modelo.buscar_por_nombre(nombre, campos)):
+            if producto:
+                return producto
+        return None
+    
+    def existe_id(self, producto_id):
+        """
+        Verifica si existe un producto con el ID indicado.
+        
+        Args:
+            producto_id (int): ID del producto
+        
+        Returns:
+            bool: True si existe
+        """
+        return self.gestor.modelo(self.gestor.shard_para_id(producto_id)).existe_id(producto_id)
+    
+    def existe_nombre(self, nombre, excluir_id=None):
+        """
+        Verifica si existe un producto con el nombre indicado en algún shard.
+        
+        Args:
+            nombre (str): Nombre del producto
+            excluir_id (int): ID de un producto a ignorar en la comprobación
+        
+        Returns:
+            bool: True si existe
+        """
+        return any(self._en_todos(lambda modelo: modelo.existe_nombre(nombre, excluir_id)))
+    
+    def crear(self, nombre, precio, categoria, stock=0):
+        """
+        Crea un producto en el shard que le asigna la tabla de ruteo.
+        
+        Returns:
+            int: ID del producto creado
+        
+        Raises:
+            Exception: Si el ID generado no corresponde al shard (el producto
+                se elimina antes de lanzar la excepción)
+        """
+        shard = self.gestor.shard_para_alta(categoria)
+        modelo = self.gestor.modelo(shard)
+        self.gestor.configurar_autoincremento(shard)
+        producto_id = modelo.crear(nombre, precio, categoria, stock)
+        if self.gestor.shard_para_id(producto_id) != shard:
+            modelo.eliminar(producto_id)
+            raise Exception(
+                f"El ID {producto_id} generado en '{shard}' corresponde a "
+                f"'{self.gestor.shard_para_id(producto_id)}'; revisa el intercalado de AUTO_INCREMENT"
+            )
+        return producto_id
+    
+    def actualizar(self, producto_id, nombre, precio, categoria, stock):
+        """
+        Actualiza un producto en su shard.
+        
+        El producto permanece en el shard donde se creó aunque cambie de
+        categoría, ya que su ID lo identifica.
+        
+        Returns:
+            bool: True si se actualizó correctamente, False si no existe
+        """
+        modelo = self.gestor.modelo(self.gestor.shard_para_id(producto_id))
+        return modelo.actualizar(producto_id, nombre, precio, categoria, stock)
+    
+    def eliminar(self, producto_id):
+        """
+        Elimina un producto de su shard.
+        
+        Returns:
+            bool: True si se eliminó correctamente, False si no existe
+        """
+        return self.gestor.modelo(self.gestor.shard_para_id(producto_id)).eliminar(producto_id)
+    
+    def actualizar_precios(self, filtros=None, porcentaje=None, monto=None, dry_run=False, limite_vista_previa=10,
+                           permitir_sin_filtros=False):
+        """
+        Ajusta precios en todos los shards en paralelo (ver ProductoModel.actualizar_precios).
+        
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}
+        
+        Raises:
+            ErrorActualizacionParcial: Si falla en algún shard tras confirmarse en otros
+        """
+        return self._actualizar_en_todos(
+            lambda modelo: modelo.actualizar_precios(
+                filtros, porcentaje, monto, dry_run, limite_vista_previa, permitir_sin_filtros
+            ),
+            dry_run, limite_vista_previa
+        )
+    
+    def actualizar_stock(self, filtros=None, cantidad=None, valor=None, dry_run=False, limite_vista_previa=10,
+                         permitir_sin_filtros=False):
+        """
+        Ajusta el stock en todos los shards en paralelo (ver ProductoModel.actualizar_stock).
+        
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}
+        
+        Raises:
+            ErrorActualizacionParcial: Si falla en algún shard tras confirmarse en otros
+        """
+        return self._actualizar_en_todos(
+            lambda modelo: modelo.actualizar_stock(
+                filtros, cantidad, valor, dry_run, limite_vista_previa, permitir_sin_filtros
+            ),
+            dry_run, limite_vista_previa
+        )
+    
+    def _actualizar_en_todos(self, operacion, dry_run, limite_vista_previa):
+        """
+        Ejecuta una actualización masiva en todos los shards y combina los resultados.
+        
+        Cada shard confirma su propia transacción, por lo que si alguno falla
+        los demás ya pueden haber aplicado los cambios; en ese caso se informa
+        qué shards los aplicaron.
+        
+        Args:
+            operacion (callable): Función que recibe un ProductoModel
+            dry_run (bool): Si la operación es una simulación
+            limite_vista_previa (int): Máximo de productos en la vista previa
+        
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}
+        
+        Raises:
+            ErrorActualizacionParcial: Si una actualización real falla en algún
+                shard tras confirmarse en otros; si falla en todos, se relanza
+                la primera excepción
+        """
+        def intentar(modelo):
+            try:
+                return operacion(modelo), None
+            except Exception as e:
+                return None, e
+        
+        resultados = dict(zip(self.gestor.nombres, self._en_todos(intentar)))
+        fallidos = {nombre: error for nombre, (_, error) in resultados.items() if error is not None}
+        if fallidos:
+            aplicados = {
+                nombre: resultado['afectados']
+                for nombre, (resultado, error) in resultados.items() if error is None
+            }
+            if dry_run or not aplicados:
+                raise next(iter(fallidos.values()))
+            raise ErrorActualizacionParcial(aplicados, fallidos)
+        return self._combinar_actualizaciones(
+            [resultado for resultado, _ in resultados.values()], limite_vista_previa
+        )
+    
+    def _combinar_actualizaciones(self, resultados, limite_vista_previa):
+        """
+        Suma los afectados de cada shard y une sus vistas previas ordenadas por ID.
+        
+        Args:
+            resultados (list): Resultados de cada shard
+            limite_vista_previa (int): Máximo de productos en la vista previa
+        
+        Returns:
+            dict: {'afectados': int, 'vista_previa': list}
+        """
+        vista_previa = heapq.merge(*(r['vista_previa'] for r in resultados), key=lambda p: p['id'])
+        return {
+            'afectados': sum(r['afectados'] for r in resultados),
+            'vista_previa': list(itertools.islice(vista_previa, limite_vista_previa))
+        }
@@ -0,0 +1,244 @@
+"""
+Módulo de perfilado de CPU y memoria para las operaciones de main.py.
+
+Envuelve los métodos del controlador, el modelo y la vista para medir, por
+cada operación del menú:
+- Espera de base de datos: tiempo de pared del modelo menos su tiempo de CPU
+- CPU de Python: tiempo de CPU del hilo en el controlador y el modelo
+  (validaciones, conversión de filas, etc.)
+- Renderizado: tiempo de pared de los métodos de la vista que imprimen
+- Memoria pico: máximo reservado según tracemalloc
+
+Solo se mide mientras se ejecuta un método envuelto, de modo que la espera
+de la entrada del usuario no contamina los resultados. Cada operación se
+guarda en disco como un archivo pstats (.prof) y un archivo de pilas
+colapsadas (.folded) listo para flamegraph.pl o speedscope.
+
+Las pilas colapsadas se reconstruyen a partir de las relaciones
+llamador/llamado de cProfile al terminar la operación, sin hilos auxiliares
+que consuman CPU o memoria durante la medición. cProfile solo registra pares
+llamador/llamado, no pilas completas, por lo que el resultado es una
+aproximación: cuando una función se llama desde varios sitios, su tiempo se
+reparte en proporción al tiempo de cada llamada, y el recorrido se limita en
+profundidad y en número de pilas para que su coste no crezca de forma
+exponencial.
+"""
+
+import collections
+import cProfile
+import functools
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Perfilador:
+    """
+    Perfilador de operaciones que separa el tiempo en base de datos, CPU de
+    Python y renderizado, y registra la memoria pico de cada operación.
+    """
+    
+    # Métodos de la vista que solo imprimen (los que piden datos esperan al usuario)
+    METODOS_RENDERIZADO = ('listar_productos', 'mostrar_producto', 'mostrar_mensaje')
+    
+    # Límites del recorrido al reconstruir las pilas colapsadas
+    PROFUNDIDAD_MAXIMA_PILA = 64
+    MAXIMO_PILAS = 20000
+    
+    def __init__(self, directorio='perfiles'):
+        """
+        Inicializa el perfilador.
+        
+        Args:
+            directorio (str): Carpeta donde se guardan los perfiles
+        """
+        self.directorio = directorio
+        self._contador = 0
+        self._operacion = None
+        self._profundidad = collections.Counter()
+        os.makedirs(directorio, exist_ok=True)
+    
+    def envolver(self, objeto, capa, metodos=None):
+        """
+        Reemplaza los métodos públicos de un objeto por versiones medidas.
+        
+        Args:
+            objeto: Instancia del controlador, el modelo o la vista
+            capa (str): 'controlador', 'modelo' o 'vista'
+            metodos (iterable): Métodos a envolver; por defecto todos los públicos
+        """
+        if metodos is None:
+            metodos = [nombre for nombre in dir(objeto) if not nombre.startswith('_')]
+        for nombre in metodos:
+            metodo = getattr(objeto, nombre)
+            if callable(metodo):
+                setattr(objeto, nombre, self._medir(metodo, capa))
+    
+    def _medir(self, metodo, capa):
+        """
+        Crea un envoltorio que acumula tiempos de pared y CPU por grupo.
+        
+        Los grupos son 'logica' (controlador y modelo), 'modelo' y 'vista'.
+        Solo se mide la llamada más externa de cada grupo para no contar dos
+        veces las llamadas anidadas.
+        
+        Args:
+            metodo (callable): Método original
+            capa (str): Capa a la que pertenece el método
+        
+        Returns:
+            callable: Método envuelto
+        """
+        grupos = {
+            'controlador': ('logica',),
+            'modelo': ('logica', 'modelo'),
+            'vista': ('vista',),
+        }[capa]
+        
+        @functools.wraps(metodo)
+        def envuelto(*args, **kwargs):
+            operacion = self._operacion
+            if operacion is None:
+                return metodo(*args, **kwargs)
+            
+            externos = [grupo for grupo in grupos if self._profundidad[grupo] == 0]
+            primera = sum(self._profundidad.values()) == 0
+            for grupo in grupos:
+                self._profundidad[grupo] += 1
+            if primera:
+                operacion['perfil'].enable()
+            
+            inicio_pared = time.perf_counter()
+            inicio_cpu = time.thread_time()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                pared = time.perf_counter() - inicio_pared
+                cpu = time.thread_time() - inicio_cpu
+                for grupo in grupos:
+                    self._profundidad[grupo] -= 1
+                for grupo in externos:
+                    operacion['pared'][grupo] += pared
+                    operacion['cpu'][grupo] += cpu
+                if sum(self._profundidad.values()) == 0:
+                    operacion['perfil'].disable()
+        
+        return envuelto
+    
+    @contextmanager
+    def operacion(self, nombre):
+        """
+        Mide una operación del menú y guarda sus perfiles al terminar.
+        
+        Args:
+            nombre (str): Nombre de la operación (se usa en los archivos)
+        """
+        self._contador += 1
+        self._operacion = {
+            'perfil': cProfile.Profile(),
+            'pared': collections.Counter(),
+            'cpu': collections.Counter(),
+        }
+        
+        iniciado_aqui = not tracemalloc.is_tracing()
+        if iniciado_aqui:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            memoria_pico = tracemalloc.get_traced_memory()[1] - memoria_inicial
+            if iniciado_aqui:
+                tracemalloc.stop()
+            operacion, self._operacion = self._operacion, None
+            self._profundidad.clear()
+            self._guardar(nombre, operacion, memoria_pico)
+    
+    def _guardar(self, nombre, operacion, memoria_pico):
+        """
+        Escribe los archivos .prof y .folded e imprime el resumen de la operación.
+        
+        Args:
+            nombre (str): Nombre de la operación
+            operacion (dict): Datos acumulados de la operación
+            memoria_pico (int): Bytes de memoria pico durante la operación
+        """
+        pared, cpu = operacion['pared'], operacion['cpu']
+        if not pared:
+            # Ningún método medido se ejecutó (por ejemplo, al salir)
+            return
+        
+        base = os.path.join(self.directorio, f"{self._contador:03d}_{nombre}")
+        operacion['perfil'].dump_stats(base + '.prof')
+        with open(base + '.folded', 'w', encoding='utf-8') as archivo:
+            for pila, microsegundos in sorted(self._pilas_colapsadas(operacion['perfil']).items()):
+                if microsegundos > 0:
+                    archivo.write(f"{pila} {microsegundos}\n")
+        
+        espera_bd = max(pared['modelo'] - cpu['modelo'], 0.0)
+        print(
+            f"\n[perfil] {nombre}: "
+            f"BD {espera_bd * 1000:.1f} ms | "
+            f"CPU Python {cpu['logica'] * 1000:.1f} ms | "
+            f"Renderizado {pared['vista'] * 1000:.1f} ms | "
+            f"Memoria pico {memoria_pico / 1024:.1f} KB "
+            f"-> {base}.prof, {base}.folded"
+        )
+    
+    def _pilas_colapsadas(self, perfil):
+        """
+        Reconstruye pilas colapsadas aproximadas a partir de un perfil de cProfile.
+        
+        Recorre el grafo de llamadas desde las funciones raíz y asigna a cada
+        pila el tiempo propio de su última función, repartido entre los
+        llamadores en proporción al tiempo acumulado de cada llamada. Las
+        ramas de menos de un microsegundo, las que superan
+        PROFUNDIDAD_MAXIMA_PILA y las que quedan tras visitar MAXIMO_PILAS
+        pilas no se expanden: su tiempo se asigna a la pila de su llamador.
+        
+        Args:
+            perfil (cProfile.Profile): Perfil de la operación
+        
+        Returns:
+            dict: Diccionario {pila: microsegundos}
+        """
+        estadisticas = pstats.Stats(perfil).stats
+        llamados = collections.defaultdict(dict)
+        for funcion, (_, _, _, _, llamadores) in estadisticas.items():
+            for llamador, datos in llamadores.items():
+                llamados[llamador][funcion] = datos[3]
+        
+        def etiqueta(funcion):
+            archivo, linea, nombre = funcion
+            return f"{nombre} ({os.path.basename(archivo)}:{linea})"
+        
+        pilas = collections.Counter()
+        restantes = [self.MAXIMO_PILAS]
+        
+        def visitar(funcion, ruta, pila, tiempo):
+            _, _, propio, acumulado, _ = estadisticas[funcion]
+            proporcion = tiempo / acumulado if acumulado else 0.0
+            ruta = ruta + (funcion,)
+            pila = f"{pila};{etiqueta(funcion)}" if pila else etiqueta(funcion)
+            restantes[0] -= 1
+            if restantes[0] <= 0 or len(ruta) >= self.PROFUNDIDAD_MAXIMA_PILA:
+                pilas[pila] += round(tiempo * 1e6)
+                return
+            
+            pilas[pila] += round(propio * proporcion * 1e6)
+            for llamado, tiempo_llamada in llamados[funcion].items():
+                tiempo_llamado = tiempo_llamada * proporcion
+                if llamado in ruta:
+                    continue
+                if tiempo_llamado < 1e-6 or restantes[0] <= 0:
+                    pilas[pila] += round(tiempo_llamado * 1e6)
+                else:
+                    visitar(llamado, ruta, pila, tiempo_llamado)
+        
+        for funcion, (_, _, _, acumulado, llamadores) in estadisticas.items():
+            if not any(llamador in estadisticas for llamador in llamadores):
+                visitar(funcion, (), '', acumulado)
+        return pilas
@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+
+from model.producto_coalescer import ErrorConsultaCompartida, ProductoCoalescer
+
+
+class ModeloFalso:
+    """
+    Modelo que registra las consultas recibidas y tarda un poco en responder
+    para que los hilos concurrentes coincidan en vuelo.
+    """
+
+    def __init__(self, demora=0.2, error=None):
+        self.demora = demora
+        self.error = error
+        self.consultas = []
+        self._lock = threading.Lock()
+
+    def _registrar(self, consulta):
+        with self._lock:
+            self.consultas.append(consulta)
+        time.sleep(self.demora)
+        if self.error is not None:
+            raise self.error
+
+    def buscar_por_id(self, producto_id, campos=None):
+        self._registrar(('id', producto_id))
+        return {'id': producto_id}
+
+    def buscar_por_nombre(self, nombre, campos=None):
+        self._registrar(('nombre', nombre))
+        return {'nombre': nombre}
+
+    def buscar_por_ids(self, producto_ids, campos=None, tamano_lote=None):
+        self._registrar(('ids', sorted(producto_ids)))
+        return {producto_id: {'id': producto_id} for producto_id in producto_ids}
+
+
+def en_paralelo(funcion, argumentos):
+    """Ejecuta funcion(arg) en un hilo por argumento y devuelve los resultados."""
+    barrera = threading.Barrier(len(argumentos))
+    resultados = [None] * len(argumentos)
+
+    def trabajar(indice, argumento):
+        barrera.wait()
+        try:
+            resultados[indice] = funcion(argumento)
+        except Exception as e:
+            resultados[indice] = e
+
+    hilos = [threading.Thread(target=trabajar, args=item) for item in enumerate(argumentos)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+class TestProductoCoalescer(unittest.TestCase):
+
+    def test_misma_clave_hace_una_sola_consulta(self):
+        modelo = ModeloFalso()
+        coalescer = ProductoCoalescer(model=modelo)
+
+        resultados = en_paralelo(coalescer.buscar_por_id, [7] * 20)
+
+        self.assertEqual(modelo.consultas, [('id', 7)])
+        self.assertEqual(resultados, [{'id': 7}] * 20)
+
+    def test_ids_dentro_de_la_ventana_van_en_un_lote(self):
+        modelo = ModeloFalso(demora=0)
+        coalescer = ProductoCoalescer(model=modelo, ventana_lote_ms=200)
+
+        resultados = en_paralelo(coalescer.buscar_por_id, list(range(1, 11)))
+
+        self.assertEqual(modelo.consultas, [('ids', list(range(1, 11)))])
+        self.assertEqual(resultados, [{'id': producto_id} for producto_id in range(1, 11)])
+
+    def test_id_como_texto_en_lote(self):
+        modelo = ModeloFalso(demora=0)
+        coalescer = ProductoCoalescer(model=modelo, ventana_lote_ms=10)
+
+        self.assertEqual(coalescer.buscar_por_id('5'), {'id': 5})
+
+    def test_error_se_propaga_a_todos_los_hilos(self):
+        error = KeyError('sin conexión')
+        modelo = ModeloFalso(error=error)
+        coalescer = ProductoCoalescer(model=modelo)
+
+        resultados = en_paralelo(coalescer.buscar_por_nombre, ['Mouse'] * 5)
+
+        self.assertEqual(len(modelo.consultas), 1)
+        self.assertEqual(sum(resultado is error for resultado in resultados), 1)
+        compartidos = [r for r in resultados if isinstance(r, ErrorConsultaCompartida)]
+        self.assertEqual(len(compartidos), 4)
+        self.assertTrue(all(r.__cause__ is error for r in compartidos))
+
+
+if __name__ == '__main__':
+    unittest.main()
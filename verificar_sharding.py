@@ -0,0 +1,134 @@
+"""
+Verificación del sharding de productos contra varias instancias MySQL locales.
+
+Crea productos de prueba en al menos dos shards y comprueba que:
+1. Cada producto queda en el shard de su categoría y solo en él
+2. El shard calculado a partir del ID coincide con el shard real
+3. El listado mezclado de todos los shards sale en el orden de la
+   intercalación de la tabla, igual que un listado sin sharding
+
+Los productos de prueba se eliminan al terminar.
+
+Uso:
+    python verificar_sharding.py --shard localhost:3307 --shard localhost:3308 \\
+        --user root --password secreto --database edicommer_pruebas
+"""
+
+import argparse
+import sys
+import uuid
+
+from model.producto_model import ProductoModel
+from model.sharding import GestorShards, ProductoModelShardeado
+
+
+def verificar(gestor, categorias):
+    """
+    Ejecuta las comprobaciones sobre los shards registrados.
+    
+    Args:
+        gestor (GestorShards): Gestor con los shards registrados
+        categorias (dict): Diccionario {categoria: nombre_shard} de prueba
+    
+    Returns:
+        list: Errores encontrados (vacía si todo es correcto)
+    """
+    modelo = ProductoModelShardeado(gestor)
+    prefijo = f"__verificacion_{uuid.uuid4().hex[:8]}_"
+    nombres = ['Árbol', 'Banco', 'banco', 'Casa', 'Ñandú', 'zapato', 'Éxito', 'Avión']
+    creados = {}
+    errores = []
+    
+    try:
+        for indice, nombre in enumerate(nombres):
+            categoria = list(categorias)[indice % len(categorias)]
+            producto_id = modelo.crear(prefijo + nombre, 10 + indice, categoria, indice)
+            creados[producto_id] = categorias[categoria]
+        
+        # 1 y 2: ubicación de cada producto
+        for producto_id, shard_esperado in creados.items():
+            if gestor.shard_para_id(producto_id) != shard_esperado:
+                errores.append(f"El ID {producto_id} se rutea a '{gestor.shard_para_id(producto_id)}', "
+                               f"pero se creó en '{shard_esperado}'")
+            for nombre in gestor.nombres:
+                existe = gestor.modelo(nombre).existe_id(producto_id)
+                if existe != (nombre == shard_esperado):
+                    errores.append(f"El ID {producto_id} {'está' if existe else 'no está'} en '{nombre}'")
+            if modelo.buscar_por_id(producto_id) is None:
+                errores.append(f"buscar_por_id({producto_id}) no encuentra el producto")
+        
+        # 3: orden del listado mezclado, según la intercalación de la tabla
+        for direccion in ('ASC', 'DESC'):
+            for orden_por in ('nombre', 'precio', 'id'):
+                listado = [
+                    p for p in modelo.listar_todos(orden_por, direccion, campos=['id', 'nombre', 'precio'])
+                    if p['id'] in creados
+                ]
+                pesos = {}
+                for nombre in gestor.nombres:
+                    for p in gestor.modelo(nombre).listar_todos(orden_por, campos=['id', orden_por],
+                                                                incluir_peso=True):
+                        pesos[p['id']] = p.get(ProductoModel.COLUMNA_PESO, p[orden_por])
+                obtenido = [pesos[p['id']] for p in listado]
+                if obtenido != sorted(obtenido, reverse=direccion == 'DESC'):
+                    errores.append(f"Listado por {orden_por} {direccion} fuera de orden: "
+                                   f"{[p[orden_por] for p in listado]}")
+                if len(listado) != len(creados):
+                    errores.append(f"El listado por {orden_por} {direccion} devolvió "
+                                   f"{len(listado)} de {len(creados)} productos")
+    finally:
+        for producto_id in creados:
+            modelo.eliminar(producto_id)
+    
+    return errores
+
+
+def main(argv=None):
+    """
+    Registra los shards indicados por línea de comandos y ejecuta la verificación.
+    
+    Args:
+        argv (list): Argumentos de línea de comandos (por defecto sys.argv)
+    
+    Returns:
+        int: Código de salida (0 si todo es correcto)
+    """
+    parser = argparse.ArgumentParser(description="Verifica el sharding en instancias MySQL locales")
+    parser.add_argument("--shard", action="append", required=True,
+                        help="host:puerto de una instancia MySQL (repetir para cada shard)")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="edicommer")
+    args = parser.parse_args(argv)
+    
+    if len(args.shard) < 2:
+        parser.error("Se requieren al menos dos shards")
+    
+    nombres = [f"shard_{indice}" for indice in range(len(args.shard))]
+    categorias = {f"Verificación {indice}": nombre for indice, nombre in enumerate(nombres)}
+    gestor = GestorShards(tabla_ruteo=categorias)
+    
+    try:
+        for nombre, direccion in zip(nombres, args.shard):
+            host, _, puerto = direccion.partition(':')
+            gestor.registrar_shard(nombre, config={
+                "host": host,
+                "port": int(puerto or 3306),
+                "user": args.user,
+                "password": args.password,
+                "database": args.database,
+            })
+        errores = verificar(gestor, categorias)
+    finally:
+        gestor.close()
+    
+    if errores:
+        for error in errores:
+            print(f"❌ {error}")
+        return 1
+    print(f"✅ Sharding verificado en {len(nombres)} instancias")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,9 @@ class ProductoView:
     Vista que gestiona la presentación de datos al usuario.
     """
     
+    # Columnas que necesita listar_productos para mostrar la tabla
+    CAMPOS_LISTADO = ('id', 'nombre', 'precio', 'categoria', 'stock')
+    
     @staticmethod
     def mostrar_menu():
         """